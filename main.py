@@ -1,13 +1,28 @@
 import asyncio
 import base64
+import difflib
+import hashlib
 import os
 import json
+import logging
+import time
+import orjson
+import sqlite3
 import websockets
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+import httpx
+import msgspec
+import numpy as np
 
 from fastapi import FastAPI, WebSocket, Request, Response
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from requests.adapters import HTTPAdapter
+
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse, Connect
 
@@ -15,29 +30,64 @@ from dotenv import load_dotenv
 
 # RAG imports
 from pinecone import Pinecone
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 # ============================
 # Load environment variables
 # ============================
 load_dotenv()
 
-# FastAPI App
-app = FastAPI()
+# Logging (DEBUG shows partials and raw Deepgram messages)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# ====================================
+# FastAPI App (startup / shutdown)
+# ====================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # rag_cache is defined further down; it only has to exist at startup
+    await asyncio.to_thread(rag_cache.open, RAG_CACHE_DB)
+    yield
+    await rag_cache.close()
+    await openai_client.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Twilio (pooled keep-alive session for REST calls)
+twilio_http = TwilioHttpClient(pool_connections=True)
+twilio_http.session.mount(
+    "https://", HTTPAdapter(pool_connections=20, pool_maxsize=20)
+)
 
-# Twilio
 twilio_client = Client(
     os.getenv("TWILIO_ACCOUNT_SID"),
-    os.getenv("TWILIO_AUTH_TOKEN")
+    os.getenv("TWILIO_AUTH_TOKEN"),
+    http_client=twilio_http
 )
 
-# OpenAI
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI (async, shared keep-alive pool)
+openai_client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_keepalive_connections=10)
+    )
+)
 
 # Pinecone
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 index = pc.Index("skillorea-voice")   # your index name
 
+# ====================================
+# Fast JSON (orjson) for the audio path
+# ====================================
+def _dumps(obj) -> str:
+    return orjson.dumps(obj).decode("utf-8")
+
 # ====================================
 # Deepgram WebSocket Connection
 # ====================================
@@ -48,7 +98,8 @@ def sts_connect():
 
     return websockets.connect(
         "wss://agent.deepgram.com/v1/agent/converse",
-        subprotocols=["token", api_key]
+        subprotocols=["token", api_key],
+        write_limit=2**20
     )
 
 # ====================================
@@ -58,47 +109,366 @@ def load_config():
     with open("config.json", "r") as s:
         return json.load(s)
 
+# Parsed and serialized once; every call sends the same Settings frame.
+# Kept as str so it goes out as a text frame.
+DEEPGRAM_SETTINGS = _dumps(load_config())
+
+# ====================================
+# RAG Cache: exact + semantic lookup
+# ====================================
+EMBED_DIM = 1536                 # text-embedding-3-small
+RAG_CACHE_TTL = 600              # seconds
+RAG_CACHE_MAX = 1024             # entries / matrix rows
+RAG_SIMILARITY_THRESHOLD = 0.92  # cosine similarity
+RAG_NEAR_THRESHOLD = 0.85        # close to a cached query -> smaller top_k
+RAG_CACHE_DB = os.getenv("EMBED_CACHE_DB", "embed_cache.db")
+
+
+def _normalize_query(query: str) -> str:
+    return query.strip().lower()
+
+
+def _cache_key(query: str) -> bytes:
+    return hashlib.sha256(_normalize_query(query).encode("utf-8")).digest()
+
+
+def _quantize(vector):
+    """
+    float32 vector -> (int8 vector, scale), with vector ~= q * scale.
+    The scale maps the largest component to 127 so all 8 bits are used.
+    """
+    scale = float(np.abs(vector).max()) / 127 or 1.0
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+class RAGCache:
+    """
+    Two-tier cache in front of OpenAI + Pinecone.
+
+    - Exact: sha256(normalized transcript) -> {"slot", "context", "ts"}
+      (LRU + TTL)
+    - Semantic: unit-length query vectors, int8-quantized with a scale
+      per row, in one preallocated matrix (row = slot), scored with a
+      single matrix-vector product (int32 accumulation)
+    - Optional SQLite table (fp16 vectors) so entries survive restarts;
+      writes are best-effort and run off the event loop
+    """
+
+    def __init__(self, max_size=RAG_CACHE_MAX, ttl=RAG_CACHE_TTL,
+                 threshold=RAG_SIMILARITY_THRESHOLD):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+
+        self.db = None
+        self.pending = []                  # (sql, params) not yet written
+        self.writer = None                 # task draining self.pending
+
+        self._clear()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _clear(self):
+        self.entries = OrderedDict()
+        self.matrix = np.zeros((self.max_size, EMBED_DIM), dtype=np.int8)
+        self.scales = np.zeros(self.max_size, dtype=np.float32)
+        self.slots = [None] * self.max_size  # row -> key
+        self.free = []                       # evicted rows, reused first
+        self.rows = 0                        # high-water mark of used rows
+
+    def open(self, path: str):
+        """Attach the SQLite table; on any error stay memory-only."""
+        db = None
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            self._load(db)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("RAG cache DB unavailable, memory only: %s", e)
+            self._clear()  # drop anything loaded before the failure
+            if db is not None:
+                db.close()
+            return
+
+        self.db = db
+
+    async def close(self):
+        if self.db is None:
+            return
+
+        if self.writer is not None:
+            await self.writer
+        await self._flush()
+
+        self.db.close()
+        self.db = None
+
+    def _load(self, db):
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS emb("
+            "hash BLOB PRIMARY KEY, vec BLOB, ctx TEXT, ts INTEGER)"
+        )
+        db.execute(
+            "DELETE FROM emb WHERE ts < ?", (int(time.time() - self.ttl),)
+        )
+        db.commit()
+
+        # Newest rows last so they end up most-recently-used
+        rows = db.execute(
+            "SELECT hash, vec, ctx, ts FROM "
+            "(SELECT * FROM emb ORDER BY ts DESC LIMIT ?) ORDER BY ts",
+            (self.max_size,)
+        ).fetchall()
+
+        bad = []
+        for key, vec, ctx, ts in rows:
+            vector = self._decode_row(vec, ctx, ts)
+            if vector is None:
+                bad.append((key,))
+                continue
+            self._insert(key, vector, ctx, ts)
+
+        # Damaged rows (wrong size, zero/NaN vector, old EMBED_DIM) are dropped
+        if bad:
+            db.executemany("DELETE FROM emb WHERE hash = ?", bad)
+            db.commit()
+
+        logger.info(
+            "RAG cache loaded %d entries from disk (%d bad rows dropped)",
+            len(rows) - len(bad), len(bad)
+        )
+
+    @staticmethod
+    def _decode_row(vec, ctx, ts):
+        """Unit float32 vector from a stored row, or None if it is unusable."""
+        if not isinstance(vec, bytes) or len(vec) != EMBED_DIM * 2:
+            return None
+        if not isinstance(ctx, str) or not isinstance(ts, (int, float)):
+            return None
+
+        vector = np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        if not np.isfinite(norm) or norm == 0:
+            return None
+
+        return vector / norm
+
+    def _persist(self, sql: str, params):
+        """Queue a write; a background task applies it in a worker thread."""
+        if self.db is None:
+            return
+
+        self.pending.append((sql, params))
+        if self.writer is None or self.writer.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # picked up by the next write or close()
+            self.writer = loop.create_task(self._flush())
+
+    async def _flush(self):
+        while self.pending:
+            ops, self.pending = self.pending, []
+            await asyncio.to_thread(self._write, ops)
+
+    def _write(self, ops):
+        try:
+            for sql, params in ops:
+                self.db.execute(sql, params)
+            self.db.commit()
+        except sqlite3.Error as e:
+            logger.warning("RAG cache DB write failed: %s", e)
+            try:
+                self.db.rollback()
+            except sqlite3.Error:
+                pass
+
+    def _expired(self, entry) -> bool:
+        return time.time() - entry["ts"] > self.ttl
+
+    def _evict(self, key):
+        slot = self.entries.pop(key)["slot"]
+        self.matrix[slot] = 0
+        self.scales[slot] = 0.0
+        self.slots[slot] = None
+        self.free.append(slot)
+
+        self._persist("DELETE FROM emb WHERE hash = ?", (key,))
+
+    def get(self, key: bytes):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        if self._expired(entry):
+            self._evict(key)
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self._log("exact hit")
+        return entry["context"]
+
+    def get_similar(self, vector):
+        """Return (matching entry or None, best cosine similarity)."""
+        if not self.entries:
+            self.misses += 1
+            self._log("miss")
+            return None, 0.0
+
+        # One pass over all used rows; freed rows are zero and score 0
+        q, q_scale = _quantize(vector)
+        sims = np.einsum(
+            "ij,j->i", self.matrix[:self.rows], q, dtype=np.int32
+        )
+        scores = sims * self.scales[:self.rows] * q_scale
+
+        # Best live row; expired rows are dropped on the way so they can
+        # neither match nor count as "near" (which would shrink top_k)
+        for row in np.argsort(-scores):
+            key = self.slots[row]
+            entry = self.entries.get(key)
+            if entry is None:
+                continue
+
+            if self._expired(entry):
+                self._evict(key)
+                continue
+
+            score = float(scores[row])
+            if score <= self.threshold:
+                break
+
+            self.entries.move_to_end(key)
+            self.semantic_hits += 1
+            self._log(f"semantic hit ({score:.3f})")
+            return entry, score
+        else:
+            score = 0.0  # no live rows
+
+        self.misses += 1
+        self._log("miss")
+        return None, score
+
+    def put(self, key: bytes, vector, context: str, ts=None):
+        """
+        Cache context for a query. Pass the source entry's ts when the
+        context was reused, so its TTL is not restarted.
+        """
+        if ts is None:
+            ts = time.time()
+        self._insert(key, vector, context, ts)
+
+        self._persist(
+            "INSERT OR REPLACE INTO emb(hash, vec, ctx, ts) "
+            "VALUES (?, ?, ?, ?)",
+            (key, vector.astype(np.float16).tobytes(), context, int(ts))
+        )
+
+    def _insert(self, key: bytes, vector, context: str, ts: float):
+        if key in self.entries:
+            self._evict(key)
+
+        while len(self.entries) >= self.max_size:
+            oldest = next(iter(self.entries))
+            self._evict(oldest)
+
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = self.rows
+            self.rows += 1
+
+        self.matrix[slot], self.scales[slot] = _quantize(vector)
+        self.slots[slot] = key
+        self.entries[key] = {
+            "slot": slot,
+            "context": context,
+            "ts": ts,
+        }
+
+    def _log(self, event: str):
+        logger.info(
+            "RAG cache %s [hits=%d semantic=%d misses=%d]",
+            event, self.hits, self.semantic_hits, self.misses
+        )
+
+
+rag_cache = RAGCache()
+
 # ====================================
 # Pinecone RAG: Retrieve context
 # ====================================
 async def rag_retrieve(query: str) -> str:
-    emb = await asyncio.to_thread(
-        openai_client.embeddings.create,
+    key = _cache_key(query)
+
+    # Exact hit: skip embedding + Pinecone
+    context = rag_cache.get(key)
+    if context is not None:
+        return context
+
+    emb = await openai_client.embeddings.create(
         model="text-embedding-3-small",
         input=query,
     )
-    vector = emb.data[0].embedding
+    vector = np.asarray(emb.data[0].embedding, dtype=np.float32)
+    vector /= np.linalg.norm(vector)
 
-    res = index.query(
-        vector=vector,
-        top_k=3,
-        include_metadata=True
-    )
+    # Semantic hit: skip Pinecone, keep the source entry's age
+    entry, score = rag_cache.get_similar(vector)
+    if entry is not None:
+        context, ts = entry["context"], entry["ts"]
+    else:
+        ts = None
+        # Near a cached query: the top matches are already well known
+        top_k = 2 if score > RAG_NEAR_THRESHOLD else 3
+
+        # Pinecone client is sync; keep its RTT off the event loop
+        res = await asyncio.to_thread(
+            index.query,
+            vector=vector.tolist(),
+            top_k=top_k,
+            include_metadata=True
+        )
+
+        contexts = []
+        for match in res.matches:
+            if match.metadata and "answer" in match.metadata:
+                contexts.append(match.metadata["answer"])
 
-    contexts = []
-    for match in res.matches:
-        if match.metadata and "answer" in match.metadata:
-            contexts.append(match.metadata["answer"])
+        context = "\n".join(contexts) if contexts else "No relevant context."
 
-    return "\n".join(contexts) if contexts else "No relevant context."
+    rag_cache.put(key, vector, context, ts=ts)
+    return context
 
 # ====================================
 # Deepgram Transcript Extractor
 # ====================================
-def _extract_transcript_from_deepgram(decoded: dict):
-    transcript = ""
-    is_final = False
-    response_id = decoded.get("response_id") or decoded.get("id")
+class DeepgramMessage(msgspec.Struct):
+    """Only the fields we read; everything else is skipped while decoding."""
+    type: str = ""
+    transcript: str | None = None
+    text: str | None = None
+    is_final: bool | None = None
+    id: str | None = None
+    response_id: str | None = None
+    alternatives: list[dict] = msgspec.field(default_factory=list)
+
+
+deepgram_decoder = msgspec.json.Decoder(DeepgramMessage)
 
-    # Direct fields
-    transcript = decoded.get("transcript") or decoded.get("text") or ""
 
-    if "is_final" in decoded:
-        is_final = decoded.get("is_final")
+def _extract_transcript_from_deepgram(decoded: DeepgramMessage):
+    response_id = decoded.response_id or decoded.id
+
+    # Direct fields
+    transcript = decoded.transcript or decoded.text or ""
+    is_final = decoded.is_final
 
     # Alternatives block
-    if not transcript and "alternatives" in decoded:
-        alts = decoded.get("alternatives", [])
+    if not transcript:
+        alts = decoded.alternatives
         if alts:
             transcript = alts[0].get("transcript") or alts[0].get("text") or ""
             if alts[0].get("final") or alts[0].get("is_final"):
@@ -109,41 +479,14 @@ def _extract_transcript_from_deepgram(decoded: dict):
 # ====================================
 # Handle barge-in
 # ====================================
-async def handle_barge_in(decoded, twilio_ws, streamsid):
-    if decoded.get("type") == "UserStartedSpeaking":
-        await twilio_ws.send_text(json.dumps({
-            "event": "clear",
-            "streamSid": streamsid
-        }))
+async def handle_barge_in(decoded, twilio_ws, clear_frame):
+    if decoded.type == "UserStartedSpeaking":
+        await twilio_ws.send_text(clear_frame)
 
 # ====================================
-# MAIN AI HANDLER — RAG + Deepgram Thinking
+# Deepgram Thinking Prompt (static parts)
 # ====================================
-async def handle_text_message(decoded, twilio_ws, sts_ws, streamsid):
-    await handle_barge_in(decoded, twilio_ws, streamsid)
-
-    transcript, is_final, response_id = _extract_transcript_from_deepgram(decoded)
-
-    if not transcript:
-        return
-
-    if not is_final:
-        print("Partial:", transcript)
-        return
-
-    print("Final transcript:", transcript)
-
-    # ----------- RAG Retrieve ----------------
-    try:
-        context = await rag_retrieve(transcript)
-    except Exception as e:
-        print("RAG error:", e)
-        context = "No relevant context."
-
-    # ----------- Deepgram Thinking Prompt -----
-    
-    instructions = f"""
-You are Skillorea AI, the official voice assistant of the Skillorea educational platform.
+PROMPT_PREFIX = """You are Skillorea AI, the official voice assistant of the Skillorea educational platform.
 
 Your purpose:
 - Introduce and promote the Skillorea.
@@ -168,31 +511,133 @@ Rules:
 5. Your identity is ONLY “Skillorea AI,” not a tutor or medical/technical expert.
 
 User Question:
-{transcript}
+"""
+
+PROMPT_MIDDLE = """
 
 Retrieved Context (your ONLY knowledge):
-{context}
+"""
+
+PROMPT_SUFFIX = """
 
 Using ONLY the retrieved context, respond as the Skillorea app’s voice assistant.
-If the context does not contain the answer, clearly state that the information is not available.
+If the context does not contain the answer, clearly state that the information is not available."""
 
-"""
 
-    payload = {
-        "type": "response.create",
-        "response_id": response_id,
-        "instructions": instructions.strip()
-    }
+def _escape(text: str) -> bytes:
+    """JSON-escape a string without the surrounding quotes."""
+    return orjson.dumps(text)[1:-1]
+
+
+# ====================================
+# Deepgram response.create frame (pre-escaped static parts)
+# ====================================
+RESPONSE_HEAD = b'{"type":"response.create","response_id":'
+RESPONSE_PREFIX = b',"instructions":"' + _escape(PROMPT_PREFIX)
+RESPONSE_MIDDLE = _escape(PROMPT_MIDDLE)
+RESPONSE_SUFFIX = _escape(PROMPT_SUFFIX) + b'"}'
+
+# ====================================
+# Duplicate final transcripts
+# ====================================
+DEDUP_WINDOW = 2.0     # seconds
+DEDUP_RATIO = 0.9      # difflib similarity
+DEDUP_HISTORY = 4      # finals remembered per stream
+
+
+def _is_duplicate_final(transcript: str, last_finals) -> bool:
+    now = time.monotonic()
+    text = _normalize_query(transcript)
+
+    for ts, previous in last_finals:
+        if now - ts < DEDUP_WINDOW and difflib.SequenceMatcher(
+            None, previous, text
+        ).ratio() > DEDUP_RATIO:
+            return True
+
+    last_finals.append((now, text))
+    return False
+
+# ====================================
+# MAIN AI HANDLER — RAG + Deepgram Thinking
+# ====================================
+async def handle_text_message(decoded, twilio_ws, sts_ws, clear_frame,
+                              last_finals):
+    await handle_barge_in(decoded, twilio_ws, clear_frame)
+
+    transcript, is_final, response_id = _extract_transcript_from_deepgram(decoded)
+
+    if not transcript:
+        return
+
+    if not is_final:
+        logger.debug("Partial: %s", transcript)
+        return
+
+    logger.info("Final transcript: %s", transcript)
 
-    print("Sending response.create to Deepgram...")
-    await sts_ws.send(json.dumps(payload))
+    # Deepgram may re-emit (almost) the same final on a pause
+    if _is_duplicate_final(transcript, last_finals):
+        logger.info("Skipping duplicate final: %s", transcript)
+        return
+
+    # ----------- RAG Retrieve ----------------
+    try:
+        context = await rag_retrieve(transcript)
+    except Exception as e:
+        logger.error("RAG error: %s", e)
+        context = "No relevant context."
+
+    # ----------- Deepgram Thinking Prompt -----
+    # Static prompt is escaped once; only transcript/context are encoded
+    frame = b"".join((
+        RESPONSE_HEAD,
+        orjson.dumps(response_id),
+        RESPONSE_PREFIX,
+        _escape(transcript),
+        RESPONSE_MIDDLE,
+        _escape(context),
+        RESPONSE_SUFFIX,
+    ))
+
+    logger.info("Sending response.create to Deepgram...")
+    await sts_ws.send(frame.decode("utf-8"))
+
+# ====================================
+# Audio pipe: Twilio -> Deepgram
+# ====================================
+class AudioPipe:
+    """
+    Single-producer / single-consumer byte pipe.
+
+    Writes append to a shared buffer; a read returns everything buffered
+    so far (up to max_bytes), so chunks that piled up go out together.
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.evt = asyncio.Event()
+
+    def write(self, data):
+        self.buf += data
+        self.evt.set()
+
+    async def read(self, max_bytes: int) -> bytes:
+        await self.evt.wait()
+        data = bytes(self.buf[:max_bytes])
+        del self.buf[:max_bytes]
+        if not self.buf:
+            self.evt.clear()
+        return data
 
 # ====================================
 # Send audio to Deepgram
 # ====================================
-async def sts_sender(sts_ws, audio_queue):
+MAX_COALESCE = 160 * 20 * 4  # up to 4 receiver chunks per websocket frame
+
+async def sts_sender(sts_ws, audio_pipe):
     while True:
-        chunk = await audio_queue.get()
+        chunk = await audio_pipe.read(MAX_COALESCE)
         await sts_ws.send(chunk)
 
 # ====================================
@@ -201,34 +646,46 @@ async def sts_sender(sts_ws, audio_queue):
 async def sts_receiver(sts_ws, twilio_ws, streamsid_queue):
     streamsid = await streamsid_queue.get()
 
+    # Twilio frames are serialized once per stream; only the payload varies
+    sid = _dumps(streamsid).replace("%", "%%")
+    media_envelope = (
+        '{"event":"media","streamSid":' + sid + ',"media":{"payload":"%s"}}'
+    )
+    clear_frame = _dumps({"event": "clear", "streamSid": streamsid})
+
+    last_finals = deque(maxlen=DEDUP_HISTORY)
+
     async for message in sts_ws:
         if isinstance(message, str):
-            decoded = json.loads(message)
-            print("Deepgram:", decoded)
-            await handle_text_message(decoded, twilio_ws, sts_ws, streamsid)
+            try:
+                decoded = deepgram_decoder.decode(message)
+            except msgspec.ValidationError as e:
+                logger.warning("Unexpected Deepgram message: %s", e)
+                continue
+
+            logger.debug("Deepgram: %r", decoded)
+            await handle_text_message(
+                decoded, twilio_ws, sts_ws, clear_frame, last_finals
+            )
             continue
 
         # Binary Mu-law audio
         raw_mulaw = message
-        media_message = {
-            "event": "media",
-            "streamSid": streamsid,
-            "media": {
-                "payload": base64.b64encode(raw_mulaw).decode("utf-8")
-            }
-        }
-        await twilio_ws.send_text(json.dumps(media_message))
+        payload = base64.b64encode(raw_mulaw).decode("ascii")
+        await twilio_ws.send_text(media_envelope % payload)
 
 # ====================================
 # Receive audio from Twilio
 # ====================================
-async def twilio_receiver(twilio_ws, audio_queue, streamsid_queue):
+async def twilio_receiver(twilio_ws, audio_pipe, streamsid_queue):
     BUFFER_SIZE = 160 * 20
+    COMPACT_AT = 1 << 16
     inbuffer = bytearray()
+    read_off = 0
 
     async for message in twilio_ws.iter_text():
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             event = data["event"]
 
             if event == "start":
@@ -240,16 +697,22 @@ async def twilio_receiver(twilio_ws, audio_queue, streamsid_queue):
                 inbuffer.extend(chunk)
 
             elif event == "stop":
-                print("Twilio STOP")
+                logger.info("Twilio STOP")
                 break
 
-            # Feed Deepgram fixed size chunks
-            while len(inbuffer) >= BUFFER_SIZE:
-                audio_queue.put_nowait(inbuffer[:BUFFER_SIZE])
-                inbuffer = inbuffer[BUFFER_SIZE:]
+            # Feed Deepgram fixed size chunks (advance an offset, no tail copy)
+            while len(inbuffer) - read_off >= BUFFER_SIZE:
+                with memoryview(inbuffer) as view:
+                    audio_pipe.write(view[read_off:read_off + BUFFER_SIZE])
+                read_off += BUFFER_SIZE
+
+            # Drop consumed bytes once in a while
+            if read_off > COMPACT_AT:
+                del inbuffer[:read_off]
+                read_off = 0
 
         except Exception as e:
-            print("Twilio error:", e)
+            logger.error("Twilio error: %s", e)
             break
 
 # ====================================
@@ -267,7 +730,9 @@ async def make_call(request: CallRequest):
     if not public_url.startswith("http"):
         public_url = "https://" + public_url
 
-    call = twilio_client.calls.create(
+    # Twilio REST client is sync; keep its RTT off the event loop
+    call = await asyncio.to_thread(
+        twilio_client.calls.create,
         to=request.to_number,
         from_=os.getenv("TWILIO_PHONE_NUMBER"),
         url=f"{public_url}/voice"
@@ -331,24 +796,41 @@ async def voice_start(request: Request):
 @app.websocket("/twilio")
 async def twilio_handler(twilio_ws: WebSocket):
     await twilio_ws.accept()
-    print("Twilio WebSocket connected.")
+    logger.info("Twilio WebSocket connected.")
 
-    audio_queue = asyncio.Queue()
+    audio_pipe = AudioPipe()
     streamsid_queue = asyncio.Queue()
 
     async with sts_connect() as sts_ws:
-        config = load_config()
-        await sts_ws.send(json.dumps(config))
+        await sts_ws.send(DEEPGRAM_SETTINGS)
 
-        await asyncio.gather(
-            sts_sender(sts_ws, audio_queue),
-            sts_receiver(sts_ws, twilio_ws, streamsid_queue),
-            twilio_receiver(twilio_ws, audio_queue, streamsid_queue)
-        )
+        # If any task fails, the TaskGroup cancels the others
+        async with asyncio.TaskGroup() as tg:
+            sender = tg.create_task(sts_sender(sts_ws, audio_pipe))
+            receiver = tg.create_task(
+                sts_receiver(sts_ws, twilio_ws, streamsid_queue)
+            )
+
+            # Returns on Twilio "stop" / disconnect: tear down the Deepgram side
+            await twilio_receiver(twilio_ws, audio_pipe, streamsid_queue)
+            sender.cancel()
+            receiver.cancel()
 
 # ====================================
 # Start server
 # ====================================
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000)
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+    # An import string is only needed for multiple workers; with one worker
+    # it would import this module a second time and rerun its setup.
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=5000,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        workers=workers
+    )